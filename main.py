@@ -6,18 +6,32 @@ from astrbot.api.event import AstrMessageEvent
 from astrbot.api.event import filter
 from astrbot.api.message_components import Image
 import aiohttp
+import asyncio
+import functools
+import itertools
 import json
 import os
+import ssl
+import time
 
 from typing import Optional
 from pydantic import BaseModel, Field
 
+# orjson 为可选依赖，未安装时回退到标准库
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 class KomariConfig(BaseModel):
     komari_url: Optional[str] = Field(None, description="Komari 服务器地址 (例如 https://status.example.com)")
     komari_token: Optional[str] = Field(None, description="API Key 或 Session Token (可选)")
     image_output: bool = Field(False, description="开启后，状态报告将调用文本转图像服务以图片形式发送。")
     dark_theme: bool = Field(True, description="开启后，生成的图片将使用深色主题背景。")
     viewport_width: int = Field(600, description="图片生成宽度 (像素)")
+    ssl_verify: bool = Field(True, description="是否校验服务器 SSL 证书，自签名证书可关闭")
+    static_cache_ttl: int = Field(30, description="实时状态查询中节点静态信息的缓存时间 (秒)，0 表示不缓存")
     
     # Custom Triggers (Regex)
     trigger_nodes: str = Field("查询\\s*Komari\\s*节点状态", description="[正则] 查询节点状态的触发指令，支持自定义。")
@@ -25,6 +39,73 @@ class KomariConfig(BaseModel):
     trigger_public: str = Field("查询\\s*Komari\\s*公开设置", description="[正则] 查询公开设置的触发指令，支持自定义。")
     trigger_version: str = Field("查询\\s*Komari\\s*版本信息", description="[正则] 查询版本信息的触发指令，支持自定义。")
 
+_HERE = os.path.dirname(__file__)
+
+# 单位换算常量
+_GB = 1024 ** 3
+_MB = 1024 ** 2
+_KB = 1024
+
+def _fmt_speed(b: float) -> str:
+    if b > _MB:
+        return f"{b / _MB:.1f} MB/s"
+    return f"{b / _KB:.1f} KB/s"
+
+def _fmt_traffic(b: float) -> str:
+    if b > _GB:
+        return f"{b / _GB:.2f} GB"
+    return f"{b / _MB:.2f} MB"
+
+# ijson 为可选依赖，用于流式解析较大的 /api/nodes 响应；
+# 纯 Python 后端比 orjson 整体解析慢得多，此时不走流式路径
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_STREAM_NODES = ijson is not None and getattr(ijson, "backend_name", "python") != "python"
+
+_STREAM_MIN_BYTES = 256 * 1024
+
+# 节点状态文本模板 (每个节点一次 format)
+_NODE_TEMPLATE = (
+    "\n📌 {status_icon} {region} {name}\n"
+    "   系统: {os_name}\n"
+    "   CPU: {cpu_name} ({cpu_cores} C)\n"
+    "   内存: {mem_gb:.2f} GB\n"
+    "   磁盘: {disk_gb:.2f} GB"
+)
+
+def _format_node_text(node: dict) -> str:
+    text = _NODE_TEMPLATE.format(
+        status_icon="🟢" if node.get("is_online", False) else "🔴",
+        region=node.get("region", ""),
+        name=node.get("name", "未知"),
+        os_name=node.get("os", "未知"),
+        cpu_name=node.get("cpu_name", "未知"),
+        cpu_cores=node.get("cpu_cores", "?"),
+        mem_gb=node.get("mem_total", 0) / _GB,
+        disk_gb=node.get("disk_total", 0) / _GB,
+    )
+    # Updated at
+    updated = node.get("updated_at_cn", "")
+    if not updated:
+        updated = node.get("updated_at", "").replace("T", " ").replace("Z", "")
+    if updated:
+        text += f"\n   更新: {updated}"
+    return text
+
+@functools.lru_cache(maxsize=4)
+def _load_template_cached(name: str) -> str:
+    path = os.path.join(_HERE, "resources", name)
+    if not os.path.exists(path):
+        return ""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+# 默认触发指令均包含 "Komari" 字样，可用于快速过滤无关消息
+_KOMARI_RE = re.compile("komari", re.IGNORECASE)
+
 @register("komari_status", "Developer", "Komari 状态监控插件", "1.0.0", "https://github.com/komari-monitor/komari")
 class KomariStatusPlugin(Star):
     def __init__(self, context: Context, config: KomariConfig = None):
@@ -35,16 +116,98 @@ class KomariStatusPlugin(Star):
         # Load template
         self.template_str = ""
         try:
-            template_path = os.path.join(os.path.dirname(__file__), "resources", "status.html")
-            if os.path.exists(template_path):
-                with open(template_path, "r", encoding="utf-8") as f:
-                    self.template_str = f.read()
+            self.template_str = _load_template_cached("status.html")
+            if self.template_str:
                 self.logger.info(f"模板加载成功，长度: {len(self.template_str)}")
             else:
-                self.logger.error(f"模板文件不存在: {template_path}")
+                self.logger.error(f"模板文件不存在: {os.path.join(_HERE, 'resources', 'status.html')}")
         except Exception as e:
             self.logger.error(f"加载模板失败: {e}")
 
+        # 预编译触发正则 (按优先级排列)
+        self._handlers = {
+            "nodes": self.komari_nodes,
+            "realtime": self.komari_realtime,
+            "public": self.komari_public,
+            "version": self.komari_version,
+        }
+        self._triggers = [
+            ("nodes", self._compile_trigger(self.config.trigger_nodes)),
+            ("realtime", self._compile_trigger(self.config.trigger_realtime)),
+            ("public", self._compile_trigger(self.config.trigger_public)),
+            ("version", self._compile_trigger(self.config.trigger_version)),
+        ]
+        # 合并为单个带命名分组的正则，一次扫描完成匹配
+        self._dispatch_re = self._build_dispatch_re(self._triggers)
+        # 仅当触发指令均为默认值时启用关键字预过滤，自定义正则 (如 ^node$) 不受影响
+        defaults = KomariConfig()
+        self._keyword_guard = all(
+            getattr(self.config, key) == getattr(defaults, key)
+            for key in ("trigger_nodes", "trigger_realtime", "trigger_public", "trigger_version")
+        )
+
+        # 节点静态信息缓存: (获取时间, {id/uuid: node})
+        self._static_nodes_cache = (0.0, {})
+
+        # SSL 上下文只创建一次，False 表示跳过证书校验
+        self._ssl_ctx = ssl.create_default_context() if self.config.ssl_verify else False
+
+        # 共享 HTTP 会话 (首次使用时创建，插件卸载时关闭)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    # 由 komari_url 派生的地址只计算一次；配置变更时 AstrBot 会重新实例化插件
+    @functools.cached_property
+    def _api_base(self) -> str:
+        return (self.config.komari_url or "").rstrip("/")
+
+    @functools.cached_property
+    def _ws_url(self) -> str:
+        base = self._api_base
+        return base.replace("https://", "wss://", 1).replace("http://", "ws://", 1) + "/api/clients"
+
+    @functools.cached_property
+    def _auth_headers(self) -> dict:
+        token = self.config.komari_token
+        if not token:
+            return {}
+        # Komari 同时支持 Bearer 与 Cookie: session_token=... 两种方式，两者都带上
+        return {"Authorization": f"Bearer {token}", "Cookie": f"session_token={token}"}
+
+    def _compile_trigger(self, pattern: str) -> re.Pattern:
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            # 用户填写的正则无效时按普通文本匹配
+            self.logger.warning(f"触发正则无效，将按普通文本匹配: {pattern} ({e})")
+            return re.compile(re.escape(pattern), re.IGNORECASE)
+
+    def _build_dispatch_re(self, triggers) -> Optional[re.Pattern]:
+        # 含反向引用的正则合并后分组编号会错位，此时保留逐个匹配
+        if any(re.search(r"\\[1-9]|\(\?P=", p.pattern) for _, p in triggers):
+            return None
+        try:
+            return re.compile(
+                "|".join(f"(?P<{name}>{p.pattern})" for name, p in triggers),
+                re.IGNORECASE,
+            )
+        except re.error as e:
+            self.logger.warning(f"合并触发正则失败，将逐个匹配: {e}")
+            return None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
+    async def terminate(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     @filter.command("komari_version", alias=["kv", "ver", "版本"])
     async def komari_version(self, event: AstrMessageEvent):
         '''查询 Komari 版本信息'''
@@ -61,49 +224,47 @@ class KomariStatusPlugin(Star):
         text = event.message_str
         if not text:
             return
+        if self._keyword_guard and not _KOMARI_RE.search(text):
+            return
 
         # 移除 ^ 和 $ 以支持更自然的语言（如 "帮我查询..."）
         # 使用 re.IGNORECASE 忽略大小写
-        
-        # 1. Nodes Status
-        if re.search(self.config.trigger_nodes, text, re.IGNORECASE):
-            async for result in self.komari_nodes(event):
-                yield result
-        
-        # 2. Realtime Status
-        elif re.search(self.config.trigger_realtime, text, re.IGNORECASE):
-            async for result in self.komari_realtime(event):
-                yield result
-            
-        # 3. Public Settings
-        elif re.search(self.config.trigger_public, text, re.IGNORECASE):
-            async for result in self.komari_public(event):
-                yield result
+        name = None
+        if self._dispatch_re is not None:
+            m = self._dispatch_re.search(text)
+            if not m:
+                return
+            # 合并正则取文本中最先出现的触发词；为保持优先级，再检查排在它之前的触发词
+            name = m.lastgroup
+            for higher, pattern in self._triggers:
+                if higher == name:
+                    break
+                if pattern.search(text):
+                    name = higher
+                    break
+        else:
+            for candidate, pattern in self._triggers:
+                if pattern.search(text):
+                    name = candidate
+                    break
 
-        # 4. Version Info
-        elif re.search(self.config.trigger_version, text, re.IGNORECASE):
-            async for result in self.komari_version(event):
-                yield result
+        if name is None:
+            return
+        async for result in self._handlers[name](event):
+            yield result
 
     async def _fetch_api(self, endpoint: str):
         if not self.config.komari_url:
             return None, "请在插件设置中配置 Komari 服务器地址。"
         
-        url = self.config.komari_url.rstrip("/") + endpoint
-        headers = {}
-        if self.config.komari_token:
-            headers["Authorization"] = f"Bearer {self.config.komari_token}"
-            # Also try Cookie if Bearer fails? Or just set both? 
-            # Komari docs say Cookie: session_token=...
-            headers["Cookie"] = f"session_token={self.config.komari_token}"
-
+        url = self._api_base + endpoint
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=10) as resp:
-                    if resp.status != 200:
-                        return None, f"API 请求错误: {resp.status}"
-                    data = await resp.json()
-                    return data, None
+            session = await self._get_session()
+            async with session.get(url, headers=self._auth_headers, ssl=self._ssl_ctx) as resp:
+                if resp.status != 200:
+                    return None, f"API 请求错误: {resp.status}"
+                data = _loads(await resp.read())
+                return data, None
         except Exception as e:
             return None, f"网络错误: {str(e)}"
 
@@ -111,35 +272,69 @@ class KomariStatusPlugin(Star):
         if not self.config.komari_url:
             return None
             
-        base_url = self.config.komari_url.rstrip("/")
-        ws_url = base_url.replace("https://", "wss://").replace("http://", "ws://") + "/api/clients"
-        
-        headers = {}
-        if self.config.komari_token:
-            headers["Authorization"] = f"Bearer {self.config.komari_token}"
-            headers["Cookie"] = f"session_token={self.config.komari_token}"
+        ws_url = self._ws_url
+
+        async def query():
+            session = await self._get_session()
+            async with session.ws_connect(ws_url, headers=self._auth_headers, ssl=self._ssl_ctx, compress=0) as ws:
+                await ws.send_str("get")
+                msg = await ws.receive()
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    resp = _loads(msg.data)
+                    if isinstance(resp, dict) and resp.get("status") == "success":
+                        raw_data = resp.get("data", {})
+                        # Structure check similar to komari_realtime
+                        if isinstance(raw_data, dict) and "online" in raw_data:
+                            return set(raw_data.get("online", []))
+                        # Fallback: maybe raw_data is list of nodes? Not common for 'get' command but possible in variants
+                        return None
+            return None
 
         try:
             # Short timeout for status check
-            timeout = aiohttp.ClientTimeout(total=3.0)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.ws_connect(ws_url, headers=headers, ssl=False) as ws:
-                    await ws.send_str("get")
-                    msg = await ws.receive()
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        resp = json.loads(msg.data)
-                        if isinstance(resp, dict) and resp.get("status") == "success":
-                            raw_data = resp.get("data", {})
-                            # Structure check similar to komari_realtime
-                            if isinstance(raw_data, dict) and "online" in raw_data:
-                                return set(raw_data.get("online", []))
-                            # Fallback: maybe raw_data is list of nodes? Not common for 'get' command but possible in variants
-                            return None
+            return await asyncio.wait_for(query(), timeout=3.0)
         except Exception as e:
             self.logger.warning(f"WS在线检查失败 (将回退到时间判断): {e}")
             return None
         return None
 
+    async def _get_static_nodes(self):
+        ts, cached = self._static_nodes_cache
+        if cached and time.monotonic() - ts < self.config.static_cache_ttl:
+            return cached
+
+        static_nodes = {}
+        try:
+            session = await self._get_session()
+            url = self._api_base + "/api/nodes"
+            async with session.get(url, headers=self._auth_headers, ssl=self._ssl_ctx) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"API 请求错误: {resp.status}")
+                if _STREAM_NODES and (resp.content_length or 0) > _STREAM_MIN_BYTES:
+                    # 大响应逐个解析节点并直接写入索引，不保留完整的响应体与节点列表
+                    async for n in ijson.items_async(resp.content, "data.item", use_float=True):
+                        n = {k: v for k, v in n.items() if v is not None}
+                        if n.get("id"):
+                            static_nodes[n["id"]] = n
+                        if n.get("uuid"):
+                            static_nodes[n["uuid"]] = n
+                else:
+                    data = _loads(await resp.read())
+                    nodes = [
+                        {k: v for k, v in n.items() if v is not None}
+                        for n in (data or {}).get("data") or []
+                    ]
+                    static_nodes = dict(itertools.chain(
+                        ((n["id"], n) for n in nodes if n.get("id")),
+                        ((n["uuid"], n) for n in nodes if n.get("uuid")),
+                    ))
+        except Exception as e:
+            self.logger.warning(f"静态节点信息获取失败: {e}")
+
+        if static_nodes:
+            self._static_nodes_cache = (time.monotonic(), static_nodes)
+        return static_nodes
+
     @filter.command("komari", alias=["k", "status", "节点"])
     async def komari_nodes(self, event: AstrMessageEvent):
         '''查询 Komari 节点状态'''
@@ -240,61 +435,49 @@ class KomariStatusPlugin(Star):
             yield event.plain_result("请在插件设置中配置 Komari 服务器地址。")
             return
 
-        # 1. 获取节点静态信息
-        static_nodes = {}
-        try:
-            data, _ = await self._fetch_api("/api/nodes")
-            if data and data.get("data"):
-                for n in data.get("data"):
-                    if n.get("id"):
-                        static_nodes[n.get("id")] = n
-                    if n.get("uuid"):
-                        static_nodes[n.get("uuid")] = n
-        except Exception as e:
-            self.logger.warning(f"静态节点信息获取失败: {e}")
+        # 1. 获取节点静态信息 (与 WebSocket 连接并发进行)
+        static_task = asyncio.create_task(self._get_static_nodes())
 
         # 2. WebSocket 连接
-        base_url = self.config.komari_url.rstrip("/")
-        ws_url = base_url.replace("https://", "wss://").replace("http://", "ws://") + "/api/clients"
-        
-        headers = {}
-        if self.config.komari_token:
-            headers["Authorization"] = f"Bearer {self.config.komari_token}"
-            headers["Cookie"] = f"session_token={self.config.komari_token}"
+        ws_url = self._ws_url
 
         realtime_data = []
         try:
-            # 增加 ssl=False 避免证书问题
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(ws_url, headers=headers) as ws:
+            try:
+                session = await self._get_session()
+                async with session.ws_connect(
+                    ws_url,
+                    headers=self._auth_headers,
+                    ssl=self._ssl_ctx,
+                    autoping=True,
+                    heartbeat=30,
+                    compress=0,
+                    max_msg_size=16 * 1024 * 1024,
+                ) as ws:
                     await ws.send_str("get")
-                    
-                    # 尝试读取响应
+                
+                    # 尝试读取响应 (TEXT / BINARY 帧均直接交给 JSON 解析)
                     for _ in range(3):
-                        msg = await ws.receive()
-                        if msg.type == aiohttp.WSMsgType.TEXT:
+                        msg = await ws.receive(timeout=10)
+                        if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
                             try:
-                                resp = json.loads(msg.data)
+                                resp = _loads(msg.data)
                                 if isinstance(resp, dict) and resp.get("status") == "success":
-                                    # Print API response as requested by user
-                                    try:
-                                        print(f"Komari WS Response: {json.dumps(resp, ensure_ascii=False, indent=2)}")
-                                    except:
-                                        pass
-                                    
+                                    # 仅在 DEBUG 级别输出原始响应，避免每次请求都序列化整个负载
+                                    if self.logger.isEnabledFor(logging.DEBUG):
+                                        self.logger.debug("Komari WS Response: %s", resp)
+                                
                                     # Handle {"data": {"online": [...], "data": {...}}} structure
                                     raw_data = resp.get("data", {})
                                     if isinstance(raw_data, dict) and "online" in raw_data and "data" in raw_data:
                                         online_uuids = raw_data.get("online", [])
                                         details_map = raw_data.get("data", {})
-                                        
-                                        realtime_list = []
-                                        for uuid in online_uuids:
-                                            if uuid in details_map:
-                                                node_info = details_map[uuid]
-                                                node_info["uuid"] = uuid
-                                                realtime_list.append(node_info)
-                                        realtime_data = realtime_list
+                                    
+                                        realtime_data = [
+                                            dict(details_map[uuid], uuid=uuid)
+                                            for uuid in online_uuids
+                                            if uuid in details_map
+                                        ]
                                     else:
                                         realtime_data = raw_data
                                     break
@@ -302,9 +485,19 @@ class KomariStatusPlugin(Star):
                                 pass
                         elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                             break
-        except Exception as e:
-            yield event.plain_result(f"连接失败: {e}")
-            return
+            except asyncio.TimeoutError:
+                # TimeoutError 的 str() 为空，单独提示
+                yield event.plain_result("连接超时: Komari 服务器未在规定时间内返回实时数据。")
+                return
+            except Exception as e:
+                yield event.plain_result(f"连接失败: {e}")
+                return
+
+            static_nodes = await static_task
+        finally:
+            # 连接失败、超时或生成器被关闭/取消时，不再等待静态信息
+            if not static_task.done():
+                static_task.cancel()
 
         if not realtime_data:
             yield event.plain_result("未获取到数据，请检查服务状态。")
@@ -355,7 +548,7 @@ class KomariStatusPlugin(Star):
             # 兼容处理：如果 node 是字符串（JSON String），尝试解析
             if isinstance(node, str):
                 try:
-                    node = json.loads(node)
+                    node = _loads(node)
                 except Exception:
                     self.logger.warning(f"无法解析节点数据(str): {node[:100]}...")
                     continue
@@ -365,9 +558,7 @@ class KomariStatusPlugin(Star):
                 self.logger.warning(f"节点数据格式错误，跳过: {type(node)}")
                 continue
 
-            uuid = node.get("uuid")
-            node_id = node.get("id")
-            name = node.get("name")
+            uuid, node_id, name = node.get("uuid"), node.get("id"), node.get("name")
             
             # 尝试通过 uuid 或 id 查找静态信息
             lookup_key = uuid or node_id
@@ -375,9 +566,8 @@ class KomariStatusPlugin(Star):
             # 补全信息 (从静态节点信息中合并缺失字段)
             if lookup_key and lookup_key in static_nodes:
                 static_info = static_nodes[lookup_key]
-                for k, v in static_info.items():
-                    if k not in node or node[k] is None:
-                        node[k] = v
+                # static_info 已预先剔除 None 值，实时数据中的非 None 字段优先
+                node = static_info | {k: v for k, v in node.items() if v is not None}
                 
                 # 特殊处理 name
                 if not name or name == "Unknown":
@@ -387,74 +577,70 @@ class KomariStatusPlugin(Star):
             
             # 格式化实时数据
             # 1. CPU
-            if "cpu" in node and isinstance(node["cpu"], dict):
-                 cpu_usage = node["cpu"].get("usage", 0)
+            cpu = node.get("cpu")
+            if isinstance(cpu, dict):
+                 cpu_usage = cpu.get("usage", 0)
                  if cpu_usage is not None:
                      # User reported that API returns actual percentage value (e.g. 0.375 for 0.375%), so no need to multiply by 100
                      node["cpu_usage_percent"] = round(float(cpu_usage), 2)
             
             # 2. RAM
-            if "ram" in node and isinstance(node["ram"], dict):
-                ram_total = node["ram"].get("total", 0)
-                ram_used = node["ram"].get("used", 0)
+            ram = node.get("ram")
+            if isinstance(ram, dict):
+                ram_total = ram.get("total", 0)
+                ram_used = ram.get("used", 0)
                 if ram_total > 0:
-                    node["ram_total_gb"] = round(ram_total / 1024**3, 2)
-                    node["ram_used_gb"] = round(ram_used / 1024**3, 2)
-                    node["ram_usage_percent"] = round((ram_used / ram_total) * 100, 1)
+                    node.update(
+                        ram_total_gb=round(ram_total / _GB, 2),
+                        ram_used_gb=round(ram_used / _GB, 2),
+                        ram_usage_percent=round(ram_used * 100 / ram_total, 1),
+                    )
             elif "mem_total" in node:
                  # Fallback to static info if no realtime ram info
-                 node["ram_total_gb"] = round(node.get("mem_total", 0) / 1024**3, 2)
+                 node["ram_total_gb"] = round(node.get("mem_total", 0) / _GB, 2)
 
             # 3. Disk
-            if "disk" in node and isinstance(node["disk"], dict):
-                disk_total = node["disk"].get("total", 0)
-                disk_used = node["disk"].get("used", 0)
+            disk = node.get("disk")
+            if isinstance(disk, dict):
+                disk_total = disk.get("total", 0)
+                disk_used = disk.get("used", 0)
                 if disk_total > 0:
-                    node["disk_total_gb"] = round(disk_total / 1024**3, 2)
-                    node["disk_used_gb"] = round(disk_used / 1024**3, 2)
-                    node["disk_usage_percent"] = round((disk_used / disk_total) * 100, 1)
+                    node.update(
+                        disk_total_gb=round(disk_total / _GB, 2),
+                        disk_used_gb=round(disk_used / _GB, 2),
+                        disk_usage_percent=round(disk_used * 100 / disk_total, 1),
+                    )
             elif "disk_total" in node:
-                 node["disk_total_gb"] = round(node.get("disk_total", 0) / 1024**3, 2)
+                 node["disk_total_gb"] = round(node.get("disk_total", 0) / _GB, 2)
             
             # 4. Network
-            if "network" in node and isinstance(node["network"], dict):
+            network = node.get("network")
+            if isinstance(network, dict):
                 # Convert bytes/s to MB/s or KB/s
-                up = node["network"].get("up", 0)
-                down = node["network"].get("down", 0)
-                
-                def fmt_speed(b):
-                    if b > 1024*1024:
-                        return f"{b/1024/1024:.1f} MB/s"
-                    else:
-                        return f"{b/1024:.1f} KB/s"
-                
-                node["net_up_str"] = fmt_speed(up)
-                node["net_down_str"] = fmt_speed(down)
+                up = network.get("up", 0)
+                down = network.get("down", 0)
                 
-                total_up = node["network"].get("totalUp", 0)
-                total_down = node["network"].get("totalDown", 0)
+                node["net_up_str"] = _fmt_speed(up)
+                node["net_down_str"] = _fmt_speed(down)
                 
-                def fmt_traffic(b):
-                    if b > 1024**3:
-                        return f"{b/1024**3:.2f} GB"
-                    else:
-                        return f"{b/1024**2:.2f} MB"
-                        
-                node["traffic_up_str"] = fmt_traffic(total_up)
-                node["traffic_down_str"] = fmt_traffic(total_down)
+                total_up = network.get("totalUp", 0)
+                total_down = network.get("totalDown", 0)
+                node["traffic_up_str"] = _fmt_traffic(total_up)
+                node["traffic_down_str"] = _fmt_traffic(total_down)
 
             # 5. Uptime
-            if "uptime" in node:
-                uptime_sec = node.get("uptime", 0)
+            uptime_sec = node.get("uptime")
+            if uptime_sec is not None:
                 days = uptime_sec // 86400
                 hours = (uptime_sec % 86400) // 3600
                 node["uptime_str"] = f"{days}天 {hours}小时"
 
             # 6. Load
-            if "load" in node and isinstance(node["load"], dict):
-                node["load_1"] = node["load"].get("load1")
-                node["load_5"] = node["load"].get("load5")
-                node["load_15"] = node["load"].get("load15")
+            load = node.get("load")
+            if isinstance(load, dict):
+                node["load_1"] = load.get("load1")
+                node["load_5"] = load.get("load5")
+                node["load_15"] = load.get("load15")
                 
             processed_nodes.append(node)
 
@@ -475,10 +661,7 @@ class KomariStatusPlugin(Star):
         # 尝试加载实时状态专用模板
         template_str = ""
         try:
-            path = os.path.join(os.path.dirname(__file__), "resources", "realtime.html")
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    template_str = f.read()
+            template_str = _load_template_cached("realtime.html")
         except Exception:
             pass
             
@@ -519,38 +702,9 @@ class KomariStatusPlugin(Star):
             yield event.plain_result("\n".join(msg))
 
     def _handle_text_output(self, event, nodes):
-        msg = ["🖥️ **Komari 服务器状态**"]
-        for node in nodes:
-            name = node.get("name", "未知")
-            os_name = node.get("os", "未知")
-            cpu_name = node.get("cpu_name", "未知")
-            cpu_cores = node.get("cpu_cores", "?")
-            region = node.get("region", "")
-            
-            mem = node.get("mem_total", 0)
-            disk = node.get("disk_total", 0)
-            
-            # Format bytes to GB
-            mem_gb = mem / 1024 / 1024 / 1024
-            disk_gb = disk / 1024 / 1024 / 1024
-            
-            status_icon = "🟢" if node.get("is_online", False) else "🔴"
-            
-            msg.append(f"\n📌 {status_icon} {region} {name}")
-            msg.append(f"   系统: {os_name}")
-            msg.append(f"   CPU: {cpu_name} ({cpu_cores} C)")
-            msg.append(f"   内存: {mem_gb:.2f} GB")
-            msg.append(f"   磁盘: {disk_gb:.2f} GB")
-            
-            # Updated at
-            updated = node.get("updated_at_cn", "")
-            if not updated:
-                 updated = node.get("updated_at", "").replace("T", " ").replace("Z", "")
-            
-            if updated:
-                msg.append(f"   更新: {updated}")
-        
-        return event.plain_result("\n".join(msg))
+        parts = ["🖥️ **Komari 服务器状态**"]
+        parts.extend(_format_node_text(node) for node in nodes)
+        return event.plain_result("\n".join(parts))
 
     async def _handle_image_output(self, event, nodes):
         if not self.template_str: